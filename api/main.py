@@ -1,21 +1,73 @@
-from fastapi import FastAPI, HTTPException, Query
-from pydantic import BaseModel
-from youtube_transcript_api import YouTubeTranscriptApi
-from youtube_transcript_api.formatters import TextFormatter
-import re
+from fastapi import FastAPI, Header, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Optional
+from youtube_transcript_api._transcripts import TranscriptListFetcher
+import string
+import asyncio
+import time
+import random
+import requests
+from requests.adapters import HTTPAdapter
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson
+import msgpack
 import os
 import sys
-import platform
-import pkg_resources
-from youtube_transcript_api._errors import NoTranscriptFound, TranscriptsDisabled, NoTranscriptAvailable
+from youtube_transcript_api._errors import CouldNotRetrieveTranscript, NoTranscriptFound, YouTubeRequestFailed
 
 app = FastAPI(
     title="YouTube Transcript API",
     description="YouTube 동영상의 자막을 추출하는 API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# 기본 로그 레벨(WARNING)에서는 debug 로그의 문자열 포맷팅도 일어나지 않음
+# 로그 출력은 백그라운드 스레드(QueueListener)가 맡아 요청 처리 중 stdout 쓰기로 막히지 않도록 함
+logger = logging.getLogger(__name__)
+
+class _ParentLoggerHandler(logging.Handler):
+    """큐에서 꺼낸 로그를 상위 로거에 넘겨, 일반적인 propagate와 같이
+    배포 환경에서 설정한 핸들러(uvicorn/gunicorn, 루트 로거 등)로 출력되도록 함"""
+
+    def emit(self, record):
+        if logger.parent is not None:
+            logger.parent.handle(record)
+
+_log_queue = queue.SimpleQueue()
+_log_handler = _ParentLoggerHandler()
+_log_listener = None
+
+def _start_log_listener() -> None:
+    global _log_listener
+    if _log_listener is None:
+        _log_listener = QueueListener(_log_queue, _log_handler)
+        _log_listener.start()
+
+def _stop_log_listener() -> None:
+    # 남은 로그를 모두 내보낸 뒤 리스너 스레드 종료. 이미 멈췄으면 아무것도 하지 않음
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+# lifespan 이벤트 없이 실행되는 환경에서도 로그가 출력되도록 import 시점에도 시작
+_start_log_listener()
+
+# 요청 스레드에서는 큐에 넣기만 하고, 상위 로거로의 전달은 리스너 스레드가 대신 수행
+# (같은 로그가 요청 스레드에서 한 번 더 출력되지 않도록 직접 propagate는 끔)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+
 # CORS 미들웨어 추가
 app.add_middleware(
     CORSMiddleware,
@@ -25,47 +77,283 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 HTTP 헤더 허용
 )
 
+# video ID에 허용되는 문자와 ID 앞에 오는 URL 마커
+_VIDEO_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+_VIDEO_ID_MARKERS = ('v=', 'youtu.be/', 'embed/')
+_VIDEO_ID_LENGTH = 11
+
+def _is_video_id(value: str) -> bool:
+    """11자의 허용 문자로만 이루어진 video ID인지 확인"""
+    return len(value) == _VIDEO_ID_LENGTH and _VIDEO_ID_CHARS.issuperset(value)
+
+# 같은 URL 반복 요청 대비. 크기를 제한해 임의 URL로 메모리가 늘어나지 않도록 함
+@lru_cache(maxsize=4096)
 def extract_video_id(url: str) -> str:
     """여러 가지 YouTube URL 포맷에서 video ID 추출"""
-    patterns = [
-        r'v=([a-zA-Z0-9_-]{11})',
-        r'youtu\.be/([a-zA-Z0-9_-]{11})',
-        r'embed/([a-zA-Z0-9_-]{11})',
-        r'^([a-zA-Z0-9_-]{11})$'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
+    # URL이 아니라 ID만 주어진 경우 바로 반환
+    # (11자 문자열에는 마커 뒤에 11자가 올 수 없으므로 순서를 바꿔도 결과는 같음)
+    if len(url) == _VIDEO_ID_LENGTH:
+        return url if _is_video_id(url) else None
+
+    # 마커가 모두 고정 문자열이므로 정규식 대신 str.find로 찾음
+    for marker in _VIDEO_ID_MARKERS:
+        index = url.find(marker)
+        while index != -1:
+            start = index + len(marker)
+            candidate = url[start:start + _VIDEO_ID_LENGTH]
+            if _is_video_id(candidate):
+                return candidate
+            index = url.find(marker, index + 1)
     return None
 
-def get_youtube_transcript(video_id: str) -> list:
+# youtube_transcript_api는 timeout 없이 요청하므로 응답이 없는 연결이 워커 스레드를 계속 붙잡지 않도록
+# 세션 단위로 기본 timeout(연결, 읽기)을 적용. 초과하면 requests.Timeout으로 재시도 대상이 됨
+_HTTP_TIMEOUT = (3.05, 5)
+
+# 영상 하나의 자막 추출(목록 + 자막 요청, 재시도 포함)에 쓰는 시간 예산(초).
+# 재시도는 timeout까지 걸려도 이 안에 끝날 때만 시작하므로, 마지막 시도가 늦게 끝나도
+# 전체 소요 시간은 대략 예산 + 한 번의 timeout으로 Vercel의 maxDuration(30초) 안에 들어옴
+_FETCH_DEADLINE = 15
+
+# 재시도 여부를 판단할 후보 예외. 나머지는 재시도 없이 바로 전달
+_RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    YouTubeRequestFailed,
+)
+
+def _is_transient_error(error: Exception) -> bool:
+    """다시 시도하면 성공할 수 있는 네트워크 오류(연결 실패, 타임아웃, 5xx)인지 확인"""
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    if isinstance(error, YouTubeRequestFailed):
+        # YouTubeRequestFailed는 원래의 HTTPError를 처리하던 중에 발생함
+        response = getattr(error.__context__, 'response', None)
+        return response is not None and response.status_code >= 500
+    return False
+
+def _with_backoff(func, *args, deadline: float, max_retries: int = 3, base: float = 0.5, **kwargs):
+    """일시적인 오류일 때만 지수 백오프(+지터)로 재시도하고, 나머지 오류는 바로 전달
+
+    deadline(time.monotonic 기준)까지 끝낼 수 없는 재시도는 시작하지 않고 마지막 오류를 전달
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == max_retries or not _is_transient_error(e):
+                raise
+            delay = base * 2 ** attempt * (1 + random.random() * 0.5)
+            if time.monotonic() + delay + sum(_HTTP_TIMEOUT) > deadline:
+                raise
+        time.sleep(delay)
+
+# 자막 추출은 대부분 네트워크 대기이므로 CPU 수에 맞춘 기본 executor(min(32, CPU+4))보다
+# 넉넉한 전용 스레드 풀을 사용해 동시에 처리할 수 있는 요청 수를 늘림
+_FETCH_WORKERS = 32
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """timeout을 지정하지 않은 요청에 기본 timeout을 적용하는 어댑터"""
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = _HTTP_TIMEOUT
+        return super().send(request, **kwargs)
+
+def _open_fetch_resources() -> None:
+    """자막 추출용 스레드 풀과 YouTube HTTP 세션을 만들어 app.state에 저장"""
+    # YouTubeTranscriptApi.list_transcripts는 호출마다 새 세션을 만들기 때문에
+    # 세션 하나를 공유해 YouTube와의 TCP/TLS 연결을 요청 간에 재사용
+    # (호스트당 연결 풀을 워커 스레드 수만큼 두어 동시 요청 시 연결이 버려지지 않도록 함)
+    http_session = requests.Session()
+    http_adapter = _TimeoutHTTPAdapter(pool_maxsize=_FETCH_WORKERS)
+    http_session.mount("https://", http_adapter)
+    http_session.mount("http://", http_adapter)
+
+    app.state.http = http_session
+    app.state.fetch_executor = ThreadPoolExecutor(
+        max_workers=_FETCH_WORKERS, thread_name_prefix="transcript"
+    )
+
+def _fetch_resources() -> tuple:
+    """(스레드 풀, HTTP 세션)을 반환. 이벤트 루프 스레드에서만 호출
+
+    보통은 startup에서 만들어 두지만, lifespan 이벤트 없이 실행되는 환경을 위해 없으면 여기서 생성
+    """
+    if getattr(app.state, "fetch_executor", None) is None:
+        _open_fetch_resources()
+    return app.state.fetch_executor, app.state.http
+
+def _close_fetch_resources() -> None:
+    """스레드 풀과 HTTP 세션을 정리. 이미 정리됐으면 아무것도 하지 않음"""
+    executor = getattr(app.state, "fetch_executor", None)
+    http_session = getattr(app.state, "http", None)
+    app.state.fetch_executor = None
+    app.state.http = None
+    if executor is not None:
+        executor.shutdown(wait=False)
+    if http_session is not None:
+        http_session.close()
+
+# 자막 언어 우선순위. 요청마다 리스트를 새로 만들지 않도록 모듈 수준 튜플로 둠
+_PRIMARY_LANGUAGES = ('en',)
+_FALLBACK_LANGUAGES = ('ko', 'en')
+
+def get_youtube_transcript(video_id: str, http_session: requests.Session) -> list:
     """가능한 한 단순하게 자막 추출 시도"""
-    print(f"자막 추출 시작: {video_id}")
-    
+    # 목록 요청과 자막 요청이 하나의 시간 예산을 나눠 씀
+    deadline = time.monotonic() + _FETCH_DEADLINE
+
+    # 자막 목록은 한 번만 받아오고 언어 선택은 메모리에서 처리
+    transcript_list = _with_backoff(
+        TranscriptListFetcher(http_session).fetch, video_id, deadline=deadline
+    )
+
     try:
-        # 아무 옵션 없이 바로 시도
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        return transcript
+        # 기본 언어(영어) 자막부터 시도
+        return _with_backoff(
+            transcript_list.find_transcript(_PRIMARY_LANGUAGES).fetch, deadline=deadline
+        )
         
-    except (NoTranscriptFound, TranscriptsDisabled, NoTranscriptAvailable) as e:
-        # 실패하면 자동 자막 시도
+    except NoTranscriptFound:
+        # 요청한 언어의 자막이 없을 때만 자동 자막 시도
+        return _with_backoff(
+            transcript_list.find_transcript(_FALLBACK_LANGUAGES).fetch,
+            deadline=deadline,
+            preserve_formatting=True
+        )
+
+# 자막 캐시: video_id -> (만료 시각, 자막, 예외). 오래 안 쓴 항목부터 제거
+_TRANSCRIPT_CACHE_SIZE = 1024
+_TRANSCRIPT_CACHE_TTL = 3600
+_TRANSCRIPT_ERROR_TTL = 60
+# 자막 추출 실패로 응답할 예외. 그 외의 예외는 서버 오류로 그대로 전달
+_TRANSCRIPT_ERRORS = (CouldNotRetrieveTranscript, requests.exceptions.RequestException)
+_transcript_cache = OrderedDict()
+
+def _cache_transcript(video_id: str, transcript, error, ttl: float) -> None:
+    _transcript_cache[video_id] = (time.monotonic() + ttl, transcript, error)
+    _transcript_cache.move_to_end(video_id)
+    if len(_transcript_cache) > _TRANSCRIPT_CACHE_SIZE:
+        _transcript_cache.popitem(last=False)
+
+# 워커 재시작/콜드 스타트 후에도 유지되는 SQLite 캐시. TRANSCRIPT_CACHE_PATH를 지정했을 때만 사용
+# (공용 임시 디렉터리의 예측 가능한 파일은 다른 사용자가 먼저 만들어 내용을 바꿔 넣을 수 있으므로
+# 기본 경로를 두지 않음. 여러 워커 프로세스가 같은 파일을 공유하며, 연결은 스레드마다 하나씩 유지)
+_PERSISTENT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", "")
+_PERSISTENT_CACHE_SIZE = 10000
+_persistent_cache_local = threading.local()
+
+def _persistent_cache() -> sqlite3.Connection:
+    conn = getattr(_persistent_cache_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(_PERSISTENT_CACHE_PATH, timeout=1)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts "
+            "(video_id TEXT PRIMARY KEY, expires_at REAL NOT NULL, data BLOB NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS transcripts_expires_at ON transcripts (expires_at)"
+        )
+        _persistent_cache_local.conn = conn
+    return conn
+
+def _load_persistent_transcript(video_id: str):
+    """캐시된 (자막, 만료 시각)을 반환. 없거나 만료됐으면 None"""
+    try:
+        row = _persistent_cache().execute(
+            "SELECT data, expires_at FROM transcripts WHERE video_id = ? AND expires_at > ?",
+            (video_id, time.time())
+        ).fetchone()
+    except sqlite3.Error as e:
+        logger.warning("자막 캐시 읽기 실패 (%s): %s", video_id, e)
+        return None
+    return (orjson.loads(row[0]), row[1]) if row else None
+
+def _store_persistent_transcript(video_id: str, transcript: list) -> None:
+    now = time.time()
+    try:
+        conn = _persistent_cache()
+        with conn:
+            conn.execute("DELETE FROM transcripts WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?)",
+                (video_id, now + _TRANSCRIPT_CACHE_TTL, orjson.dumps(transcript))
+            )
+            # 항목 수가 상한을 넘으면 만료가 가장 가까운(가장 오래전에 받은) 항목부터 제거
+            conn.execute(
+                "DELETE FROM transcripts WHERE video_id IN ("
+                "SELECT video_id FROM transcripts ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (_PERSISTENT_CACHE_SIZE,)
+            )
+    except sqlite3.Error as e:
+        logger.warning("자막 캐시 저장 실패 (%s): %s", video_id, e)
+
+def _fetch_transcript_persistent(video_id: str, http_session: requests.Session) -> tuple:
+    """SQLite 캐시를 먼저 확인하고, 없으면 YouTube에서 자막을 가져와 저장
+
+    (자막, 남은 유효 시간(초))을 반환. SQLite에서 읽은 자막은 원래 만료 시각까지만 유효
+    """
+    if _PERSISTENT_CACHE_PATH:
+        cached = _load_persistent_transcript(video_id)
+        if cached is not None:
+            transcript, expires_at = cached
+            return transcript, expires_at - time.time()
+
+    transcript = get_youtube_transcript(video_id, http_session)
+    if _PERSISTENT_CACHE_PATH:
+        _store_persistent_transcript(video_id, transcript)
+    return transcript, _TRANSCRIPT_CACHE_TTL
+
+# 진행 중인 자막 추출 작업: video_id -> asyncio.Task
+# 같은 영상에 대한 동시 요청은 새로 요청하지 않고 이 작업의 결과를 함께 기다림
+_inflight_fetches = {}
+
+async def _fetch_and_cache_transcript(video_id: str) -> list:
+    """워커 스레드에서 자막을 추출하고 결과(실패 포함)를 메모리 캐시에 저장"""
+    try:
+        executor, http_session = _fetch_resources()
         try:
-            print("기본 시도 실패, 자동 자막 시도...")
-            transcript = YouTubeTranscriptApi.get_transcript(
-                video_id,
-                languages=['ko', 'en'],
-                preserve_formatting=True
+            transcript, ttl = await asyncio.get_running_loop().run_in_executor(
+                executor, _fetch_transcript_persistent, video_id, http_session
             )
+        except CouldNotRetrieveTranscript as e:
+            if _is_transient_error(e):
+                # 재시도 후에도 남은 YouTube 5xx 오류는 운영자가 볼 수 있도록 warning으로 기록
+                logger.warning("YouTube 요청 실패 (%s): %s", video_id, e)
+            else:
+                # 자막이 없는 영상 등은 정상적인 결과이므로 debug로만 기록하고,
+                # 반복 요청이 YouTube로 몰리지 않도록 실패도 잠깐 캐시
+                logger.debug("자막 추출 실패 (%s): %s", video_id, e)
+                _cache_transcript(video_id, None, e, _TRANSCRIPT_ERROR_TTL)
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.warning("YouTube 요청 실패 (%s): %s", video_id, e)
+            raise
+        _cache_transcript(video_id, transcript, None, ttl)
+        return transcript
+    finally:
+        _inflight_fetches.pop(video_id, None)
+
+async def get_youtube_transcript_async(video_id: str) -> list:
+    """메모리 캐시를 먼저 확인하고, 없으면 워커 스레드에서 자막 추출"""
+    cached = _transcript_cache.get(video_id)
+    if cached is not None:
+        expires_at, transcript, error = cached
+        if expires_at > time.monotonic():
+            _transcript_cache.move_to_end(video_id)
+            if error is not None:
+                raise error.with_traceback(None)
             return transcript
-        except Exception as inner_e:
-            print(f"자동 자막 시도 실패: {str(inner_e)}")
-            raise Exception(f"자막을 가져올 수 없습니다: {str(inner_e)}")
-            
-    except Exception as e:
-        print(f"자막 추출 실패: {str(e)}")
-        raise Exception(f"자막 추출 중 오류 발생: {str(e)}")
+        del _transcript_cache[video_id]
+
+    task = _inflight_fetches.get(video_id)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache_transcript(video_id))
+        _inflight_fetches[video_id] = task
+    # 한 요청이 취소되어도 같은 작업을 기다리는 다른 요청에는 영향이 없도록 shield 사용
+    return await asyncio.shield(task)
 
 class TranscriptItem(BaseModel):
     text: str
@@ -75,6 +363,88 @@ class TranscriptItem(BaseModel):
 class TranscriptResponse(BaseModel):
     transcript: list[TranscriptItem]
 
+_INVALID_VIDEO_ID_DETAIL = "올바르지 않은 videoId 형식입니다."
+
+# 한 번의 일괄 요청에서 받을 수 있는 최대 영상 수와 동시에 YouTube로 보낼 요청 수
+_BATCH_MAX_VIDEOS = 50
+_BATCH_CONCURRENCY = 16
+
+class BatchTranscriptRequest(BaseModel):
+    video_ids: list[str] = Field(..., min_items=1, max_items=_BATCH_MAX_VIDEOS)
+
+class BatchTranscriptResult(BaseModel):
+    video_id: str
+    transcript: Optional[list[TranscriptItem]] = None
+    error: Optional[str] = None
+
+class BatchTranscriptResponse(BaseModel):
+    results: list[BatchTranscriptResult]
+
+# 응답 스키마는 문서에만 사용하고, 항목마다 Pydantic 모델을 만들어 검증하지는 않음
+_TRANSCRIPT_RESPONSES = {200: {"model": TranscriptResponse}}
+
+_MSGPACK_MEDIA_TYPE = "application/msgpack"
+# MessagePack 응답은 JSON 응답에 video_id가 더해진 {video_id, transcript} 객체
+_MSGPACK_RESPONSE_DESCRIPTION = (
+    "MessagePack(`application/msgpack`)으로 인코딩한 "
+    "`{\"video_id\": str, \"transcript\": [{\"text\": str, \"start\": float, \"duration\": float}, ...]}` 객체. "
+    "JSON보다 작고 인코딩/디코딩이 빨라 내부 호출용으로 사용합니다. "
+    "Python에서는 `msgpack.unpackb(response.content)`로 디코딩합니다."
+)
+_MSGPACK_RESPONSES = {
+    200: {"description": _MSGPACK_RESPONSE_DESCRIPTION, "content": {_MSGPACK_MEDIA_TYPE: {}}}
+}
+# /api/v1/youtube/transcript는 Accept 헤더에 따라 JSON 또는 MessagePack으로 응답
+_NEGOTIATED_TRANSCRIPT_RESPONSES = {
+    200: {
+        "model": TranscriptResponse,
+        "description": "기본은 JSON `{\"transcript\": [...]}`. "
+                       "`Accept: application/msgpack`이면 " + _MSGPACK_RESPONSE_DESCRIPTION,
+        "content": {_MSGPACK_MEDIA_TYPE: {}}
+    }
+}
+
+# 이보다 긴 자막은 JSON 전체를 한 번에 만들지 않고 나눠서 스트리밍
+_STREAM_THRESHOLD = 2000
+_STREAM_CHUNK_SIZE = 500
+
+async def _stream_transcript(transcript_list: list):
+    """자막 항목을 일정 개수씩 JSON으로 인코딩해 순서대로 전송"""
+    yield b'{"transcript":['
+    for i in range(0, len(transcript_list), _STREAM_CHUNK_SIZE):
+        chunk = b','.join(map(orjson.dumps, transcript_list[i:i + _STREAM_CHUNK_SIZE]))
+        yield b',' + chunk if i else chunk
+    yield b']}'
+
+def _msgpack_response(video_id: str, transcript_list: list) -> Response:
+    content = msgpack.packb({"video_id": video_id, "transcript": transcript_list}, use_bin_type=True)
+    return Response(content=content, media_type=_MSGPACK_MEDIA_TYPE)
+
+def _transcript_response(transcript_list: list):
+    """자막 길이에 따라 일반 JSON 응답 또는 스트리밍 응답 생성"""
+    # youtube_transcript_api가 돌려주는 항목이 이미 TranscriptItem 형식이므로 그대로 반환
+    # (Response를 직접 돌려주면 FastAPI의 jsonable_encoder 변환도 생략됨)
+    if len(transcript_list) > _STREAM_THRESHOLD:
+        return StreamingResponse(_stream_transcript(transcript_list), media_type="application/json")
+    return ORJSONResponse({"transcript": transcript_list})
+
+@app.on_event("startup")
+def open_fetch_resources():
+    _fetch_resources()
+
+@app.on_event("shutdown")
+def close_fetch_resources():
+    _close_fetch_resources()
+
+@app.on_event("startup")
+def start_log_listener():
+    # 이전 shutdown에서 멈춘 리스너를 다시 시작 (쌓여 있던 로그도 이때 출력됨)
+    _start_log_listener()
+
+@app.on_event("shutdown")
+def stop_log_listener():
+    _stop_log_listener()
+
 @app.get("/")
 async def root():
     return {
@@ -82,57 +452,111 @@ async def root():
         "docs_url": "/docs"
     }
 
-@app.get("/transcript", response_model=TranscriptResponse)
+@app.get("/transcript", responses=_TRANSCRIPT_RESPONSES)
 async def transcript(url: str = Query(..., description="YouTube 동영상 URL")):
     video_id = extract_video_id(url)
     if not video_id:
         raise HTTPException(status_code=400, detail="올바르지 않은 YouTube URL입니다.")
     
     try:
-        transcript_list = get_youtube_transcript(video_id)
-    except Exception as e:
+        transcript_list = await get_youtube_transcript_async(video_id)
+    except _TRANSCRIPT_ERRORS as e:
         raise HTTPException(status_code=500, detail=f"자막을 가져오는 중 오류 발생: {str(e)}")
     
-    # 응답 형식에 맞게 변환
-    transcript_items = [
-        TranscriptItem(
-            text=item['text'],
-            start=item['start'],
-            duration=item['duration']
-        ) for item in transcript_list
-    ]
-    
-    return TranscriptResponse(transcript=transcript_items)
+    return _transcript_response(transcript_list)
 
-@app.get("/api/v1/youtube/transcript", response_model=TranscriptResponse)
-async def gpt_transcript(videoId: str = Query(..., description="YouTube 비디오 ID")):
+@app.get("/api/v1/youtube/transcript", responses=_NEGOTIATED_TRANSCRIPT_RESPONSES)
+async def gpt_transcript(
+    videoId: str = Query(..., description="YouTube 비디오 ID"),
+    accept: Optional[str] = Header(None, description="`application/msgpack`이면 MessagePack으로 응답")
+):
+    """자막을 반환합니다. `Accept: application/msgpack` 헤더를 보내면 MessagePack으로 응답합니다."""
     if not videoId:
         raise HTTPException(status_code=400, detail="videoId가 필요합니다.")
+    if not _is_video_id(videoId):
+        # 형식이 잘못된 ID는 YouTube에 요청하지 않고 바로 거절
+        raise HTTPException(status_code=400, detail=_INVALID_VIDEO_ID_DETAIL)
     
     try:
-        transcript_list = get_youtube_transcript(videoId)
-        
-        # 응답 변환
-        transcript_items = [
-            TranscriptItem(
-                text=item['text'],
-                start=item['start'],
-                duration=item['duration']
-            ) for item in transcript_list
-        ]
-        
-        return TranscriptResponse(transcript=transcript_items)
+        transcript_list = await get_youtube_transcript_async(videoId)
+        if accept and _MSGPACK_MEDIA_TYPE in accept:
+            return _msgpack_response(videoId, transcript_list)
+        return _transcript_response(transcript_list)
     
-    except Exception as e:
+    except _TRANSCRIPT_ERRORS as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@app.get("/system-info")
-async def system_info():
-    """시스템 정보와 설치된 패키지 정보를 반환합니다."""
-    installed_packages = [
-        f"{pkg.key}=={pkg.version}"
-        for pkg in pkg_resources.working_set
-    ]
+@app.get(
+    "/api/v1/youtube/transcript.msgpack",
+    response_class=Response,
+    responses=_MSGPACK_RESPONSES
+)
+async def gpt_transcript_msgpack(videoId: str = Query(..., description="YouTube 비디오 ID")):
+    """자막을 MessagePack으로 반환합니다. Accept 헤더를 보낼 수 없는 클라이언트를 위한 경로로,
+    `Accept: application/msgpack`으로 `/api/v1/youtube/transcript`를 호출한 것과 같은 응답입니다."""
+    if not _is_video_id(videoId):
+        raise HTTPException(status_code=400, detail=_INVALID_VIDEO_ID_DETAIL)
+    
+    try:
+        transcript_list = await get_youtube_transcript_async(videoId)
+    except _TRANSCRIPT_ERRORS as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return _msgpack_response(videoId, transcript_list)
+
+@app.post("/api/v1/youtube/transcripts", responses={200: {"model": BatchTranscriptResponse}})
+async def gpt_transcripts(request: BatchTranscriptRequest):
+    """여러 영상의 자막을 동시에 추출합니다. 일부 영상이 실패해도 나머지 결과는 반환합니다."""
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+
+    async def fetch(video_id: str) -> list:
+        async with semaphore:
+            return await get_youtube_transcript_async(video_id)
+
+    # 형식이 잘못된 ID는 요청하지 않고, 중복된 ID는 한 번만 요청
+    video_ids = list(dict.fromkeys(v for v in request.video_ids if _is_video_id(v)))
+    outcomes = dict(zip(video_ids, await asyncio.gather(
+        *(fetch(video_id) for video_id in video_ids),
+        return_exceptions=True
+    )))
+
+    results = []
+    for video_id in request.video_ids:
+        if video_id not in outcomes:
+            results.append({"video_id": video_id, "transcript": None, "error": _INVALID_VIDEO_ID_DETAIL})
+            continue
+        outcome = outcomes[video_id]
+        if isinstance(outcome, _TRANSCRIPT_ERRORS):
+            results.append({"video_id": video_id, "transcript": None, "error": str(outcome)})
+        elif isinstance(outcome, Exception):
+            # 라이브러리 내부의 파싱 오류(ParseError, JSONDecodeError 등)도 해당 영상의 실패로만 처리
+            logger.warning("일괄 요청 중 예기치 않은 자막 추출 오류 (%s): %r", video_id, outcome)
+            results.append({"video_id": video_id, "transcript": None, "error": str(outcome)})
+        elif isinstance(outcome, BaseException):
+            # CancelledError 등은 일괄 요청 전체를 중단
+            raise outcome
+        else:
+            results.append({"video_id": video_id, "transcript": outcome, "error": None})
+    return ORJSONResponse({"results": results})
+
+@lru_cache(maxsize=None)
+def _collect_system_info() -> dict:
+    """프로세스 동안 바뀌지 않는 시스템 정보를 한 번만 수집"""
+    # 자막 요청의 콜드 스타트에 영향이 없도록 이 엔드포인트에서만 쓰는 모듈은 여기서 import
+    import importlib.metadata
+    import platform
+    import re
+
+    # pkg_resources.working_set처럼 메타데이터가 없는 항목은 건너뛰고,
+    # 같은 패키지가 sys.path에 여러 번 있으면 먼저 찾은 것만 표시
+    packages = {}
+    for dist in importlib.metadata.distributions():
+        name = dist.metadata['Name']
+        if name is None:
+            continue
+        key = re.sub(r'[^A-Za-z0-9.]+', '-', name).lower()
+        packages.setdefault(key, dist.version)
+    installed_packages = [f"{key}=={version}" for key, version in packages.items()]
     
     return {
         "python_version": sys.version,
@@ -142,4 +566,9 @@ async def system_info():
         "environment_variables": dict(os.environ)
     }
 
+@app.get("/system-info")
+async def system_info():
+    """시스템 정보와 설치된 패키지 정보를 반환합니다."""
+    return _collect_system_info()
+
 # Vercel은 파일 내에서 "app"이라는 변수를 엔트리 포인트로 인식합니다.